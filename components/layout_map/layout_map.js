@@ -0,0 +1,394 @@
+// Mapa del layout PT como componente bidireccional de Streamlit.
+// El SVG estático llega una sola vez (layout_key); después cada render solo trae
+// el estado compacto (ubicaciones ocupadas -> tooltip, camiones físicos en uso)
+// y los colores se actualizan en el lugar, sin perder el zoom.
+// Pan/zoom propio sobre el viewBox: no depende de librerías externas (red de planta sin internet).
+// Con nivel de detalle (lod): alejado se dibuja un bloque por camión físico con su % de
+// ocupación; acercado solo las ubicaciones dentro de la vista, con un índice de rejilla.
+(function () {
+    const COLORS = {
+        ocupado: ['#2563eb', '#60a5fa'],  // AZUL: ubicación con pallet escaneado
+        en_uso: ['#d97706', '#fbbf24'],   // AMARILLO: el camión físico tiene escaneos en otras ubicaciones
+        libre: ['#16a34a', '#4ade80'],    // VERDE: zona sin actividad
+    };
+    const ZOOM_STEP = 1.3;
+    const MAX_ZOOM = 40;
+    const LOD_BLOCK_ZOOM = 2.5;   // por debajo de este zoom se dibujan bloques por camión
+    const GRID_CELLS = 64;        // celdas por lado de la rejilla de ubicaciones
+    const SVG_NS = 'http://www.w3.org/2000/svg';
+
+    const container = document.getElementById('container');
+    const wrapper = document.getElementById('svg-wrapper');
+    const debug = document.getElementById('debug-info');
+    const loading = document.getElementById('loading-msg');
+
+    let layoutKey = null;
+    let svg = null;
+    let homeBox = null;   // viewBox original [x, y, w, h]
+    let box = null;       // viewBox actual
+    let overlays = new Map();    // ubicación -> [{group, rect, title}]
+    let lastState = new Map();   // ubicación -> firma del último estado pintado
+    let lastHeight = 0;
+    let lod = false;
+    let overlayLayer = null;
+    let blockLayer = null;
+    let blocks = new Map();      // camión físico -> {rect, text, title, count}
+    let grid = null;             // {cell, cells: Map('i,j' -> [grupo])}
+    let viewMode = 'todo';       // 'todo' | 'bloques' | 'vista'
+    let visible = new Set();     // grupos mostrados en modo 'vista'
+    let viewQueued = false;
+    let pendingKey = null;       // layout que se está descomprimiendo
+    let latestArgs = null;
+    let plainOnly = false;       // el navegador no pudo descomprimir: pedir SVG sin gzip
+
+    function send(type, data) {
+        window.parent.postMessage(Object.assign({ isStreamlitMessage: true, type: type }, data || {}), '*');
+    }
+
+    function setValue(value) {
+        send('streamlit:setComponentValue', { value: value, dataType: 'json' });
+    }
+
+    function updateDebug(msg, isError) {
+        debug.innerText = (isError ? '❌ ' : '📍 ') + msg;
+        debug.style.borderColor = isError ? '#ef4444' : '#10b981';
+    }
+
+    function applyBox() {
+        svg.setAttribute('viewBox', box.join(' '));
+        scheduleView();
+    }
+
+    function scheduleView() {
+        if (viewQueued) return;
+        viewQueued = true;
+        window.requestAnimationFrame(function () {
+            viewQueued = false;
+            updateView();
+        });
+    }
+
+    function buildGrid() {
+        // Índice espacial: cada grupo de la capa de color en las celdas que toca
+        const size = Math.max(homeBox[2], homeBox[3]) / GRID_CELLS;
+        grid = { cell: size, cells: new Map() };
+        overlays.forEach(function (entries) {
+            entries.forEach(function (entry) {
+                if (!entry.rect) return;
+                const x = parseFloat(entry.rect.getAttribute('x')) || 0;
+                const y = parseFloat(entry.rect.getAttribute('y')) || 0;
+                const w = parseFloat(entry.rect.getAttribute('width')) || 0;
+                const h = parseFloat(entry.rect.getAttribute('height')) || 0;
+                for (let i = Math.floor(x / size); i <= Math.floor((x + w) / size); i++) {
+                    for (let j = Math.floor(y / size); j <= Math.floor((y + h) / size); j++) {
+                        const key = i + ',' + j;
+                        if (!grid.cells.has(key)) grid.cells.set(key, []);
+                        grid.cells.get(key).push(entry.group);
+                    }
+                }
+            });
+        });
+    }
+
+    function groupsInView() {
+        const found = new Set();
+        const size = grid.cell;
+        for (let i = Math.floor(box[0] / size); i <= Math.floor((box[0] + box[2]) / size); i++) {
+            for (let j = Math.floor(box[1] / size); j <= Math.floor((box[1] + box[3]) / size); j++) {
+                const groups = grid.cells.get(i + ',' + j);
+                if (groups) groups.forEach(function (group) { found.add(group); });
+            }
+        }
+        return found;
+    }
+
+    function setMode(mode) {
+        if (mode === viewMode) return;
+        overlayLayer.style.display = mode === 'bloques' ? 'none' : '';
+        if (blockLayer) blockLayer.style.display = mode === 'bloques' ? '' : 'none';
+        if (mode === 'vista') {
+            overlays.forEach(function (entries) {
+                entries.forEach(function (entry) { entry.group.style.display = 'none'; });
+            });
+            visible = new Set();
+        } else if (viewMode === 'vista') {
+            overlays.forEach(function (entries) {
+                entries.forEach(function (entry) { entry.group.style.display = ''; });
+            });
+            visible = new Set();
+        }
+        viewMode = mode;
+    }
+
+    function updateView() {
+        if (!svg || !overlayLayer) return;
+        if (!lod) {
+            setMode('todo');
+            return;
+        }
+        const zoom = homeBox[2] / box[2];
+        if (zoom < LOD_BLOCK_ZOOM && blocks.size) {
+            setMode('bloques');
+            updateDebug('Vista por camión · ' + blocks.size + ' camiones');
+            return;
+        }
+        setMode('vista');
+        // Solo se tocan los grupos que entran o salen de la vista
+        const now = groupsInView();
+        visible.forEach(function (group) {
+            if (!now.has(group)) group.style.display = 'none';
+        });
+        now.forEach(function (group) {
+            if (!visible.has(group)) group.style.display = '';
+        });
+        visible = now;
+        updateDebug('Detalle · ' + now.size + ' de ' + overlays.size + ' ubicaciones en vista');
+    }
+
+    function buildBlocks(blockShapes) {
+        // Un bloque por camión físico: caja que envuelve sus ubicaciones
+        blocks = new Map();
+        blockLayer = document.createElementNS(SVG_NS, 'g');
+        blockLayer.setAttribute('id', 'truck-blocks');
+        blockLayer.style.display = 'none';
+        Object.keys(blockShapes || {}).forEach(function (prefix) {
+            const b = blockShapes[prefix];
+            const rect = document.createElementNS(SVG_NS, 'rect');
+            rect.setAttribute('x', b[0]);
+            rect.setAttribute('y', b[1]);
+            rect.setAttribute('width', b[2]);
+            rect.setAttribute('height', b[3]);
+            rect.setAttribute('rx', 4);
+            rect.setAttribute('stroke-width', 3);
+            rect.setAttribute('opacity', 0.92);
+            const text = document.createElementNS(SVG_NS, 'text');
+            text.setAttribute('x', b[0] + b[2] / 2);
+            text.setAttribute('y', b[1] + b[3] / 2);
+            text.setAttribute('text-anchor', 'middle');
+            text.setAttribute('dominant-baseline', 'middle');
+            text.setAttribute('font-weight', 'bold');
+            text.setAttribute('fill', '#ffffff');
+            text.setAttribute('font-size', Math.max(10, Math.min(b[2], b[3]) * 0.3));
+            text.setAttribute('pointer-events', 'none');
+            const title = document.createElementNS(SVG_NS, 'title');
+            rect.appendChild(title);
+            blockLayer.appendChild(rect);
+            blockLayer.appendChild(text);
+            blocks.set(prefix, { rect: rect, text: text, title: title, count: b[4] });
+        });
+        svg.appendChild(blockLayer);
+    }
+
+    function applyBlockFill(blockFill) {
+        blocks.forEach(function (block, prefix) {
+            const pct = blockFill[prefix] || 0;
+            const kind = pct >= 100 ? 'ocupado' : (pct > 0 ? 'en_uso' : 'libre');
+            block.rect.setAttribute('fill', COLORS[kind][0]);
+            block.rect.setAttribute('stroke', COLORS[kind][1]);
+            block.text.textContent = prefix + ' · ' + Math.round(pct) + '%';
+            block.title.textContent = 'Camión ' + prefix + ': ' + block.count + ' ubicaciones, ' + pct.toFixed(1) + '% ocupado';
+        });
+    }
+
+    function toSvgPoint(clientX, clientY, matrix) {
+        const point = svg.createSVGPoint();
+        point.x = clientX;
+        point.y = clientY;
+        return point.matrixTransform(matrix || svg.getScreenCTM().inverse());
+    }
+
+    function zoomAt(factor, clientX, clientY) {
+        if (!svg) return;
+        const scale = homeBox[2] / (box[2] * factor);
+        if (scale > MAX_ZOOM || scale < 0.5) return;
+        const rect = svg.getBoundingClientRect();
+        const p = toSvgPoint(
+            clientX === undefined ? rect.left + rect.width / 2 : clientX,
+            clientY === undefined ? rect.top + rect.height / 2 : clientY
+        );
+        box = [
+            p.x - (p.x - box[0]) * factor,
+            p.y - (p.y - box[1]) * factor,
+            box[2] * factor,
+            box[3] * factor,
+        ];
+        applyBox();
+    }
+
+    function resetView() {
+        if (!svg) return;
+        box = homeBox.slice();
+        applyBox();
+    }
+
+    function bindPanZoom() {
+        wrapper.addEventListener('wheel', function (e) {
+            e.preventDefault();
+            zoomAt(e.deltaY < 0 ? 1 / ZOOM_STEP : ZOOM_STEP, e.clientX, e.clientY);
+        }, { passive: false });
+
+        let drag = null;
+        wrapper.addEventListener('pointerdown', function (e) {
+            if (!svg) return;
+            const matrix = svg.getScreenCTM().inverse();
+            drag = { matrix: matrix, start: toSvgPoint(e.clientX, e.clientY, matrix), box: box.slice() };
+            wrapper.classList.add('dragging');
+            wrapper.setPointerCapture(e.pointerId);
+        });
+        wrapper.addEventListener('pointermove', function (e) {
+            if (!drag) return;
+            const p = toSvgPoint(e.clientX, e.clientY, drag.matrix);
+            box = [drag.box[0] + drag.start.x - p.x, drag.box[1] + drag.start.y - p.y, drag.box[2], drag.box[3]];
+            applyBox();
+        });
+        const endDrag = function () {
+            drag = null;
+            wrapper.classList.remove('dragging');
+        };
+        wrapper.addEventListener('pointerup', endDrag);
+        wrapper.addEventListener('pointercancel', endDrag);
+
+        document.getElementById('z-in').onclick = function () { zoomAt(1 / ZOOM_STEP); };
+        document.getElementById('z-out').onclick = function () { zoomAt(ZOOM_STEP); };
+        document.getElementById('z-res').onclick = resetView;
+    }
+
+    function loadSvg(markup, key, blockShapes) {
+        wrapper.innerHTML = markup;
+        svg = wrapper.querySelector('svg');
+        if (!svg) {
+            updateDebug('El layout no contiene un <svg>', true);
+            return false;
+        }
+        svg.removeAttribute('width');
+        svg.removeAttribute('height');
+        const viewBox = (svg.getAttribute('viewBox') || '').split(/[\s,]+/).map(Number);
+        if (viewBox.length === 4 && viewBox.every(isFinite) && viewBox[2] > 0 && viewBox[3] > 0) {
+            homeBox = viewBox;
+        } else {
+            const b = svg.getBBox();
+            homeBox = [b.x, b.y, Math.max(b.width, 1), Math.max(b.height, 1)];
+        }
+        box = homeBox.slice();
+        applyBox();
+
+        // Índice de la capa de color: cada grupo trae data-loc con su ubicación
+        overlays = new Map();
+        overlayLayer = svg.querySelector('#color-overlays');
+        svg.querySelectorAll('#color-overlays g[data-loc]').forEach(function (group) {
+            const loc = group.getAttribute('data-loc');
+            const entry = { group: group, rect: group.querySelector('rect'), title: group.querySelector('title') };
+            if (!overlays.has(loc)) overlays.set(loc, []);
+            overlays.get(loc).push(entry);
+        });
+        lastState = new Map();
+        viewMode = 'todo';
+        visible = new Set();
+        buildGrid();
+        buildBlocks(blockShapes);
+        layoutKey = key;
+        loading.style.display = 'none';
+        return true;
+    }
+
+    function applyState(occupied, prefixes) {
+        const inUse = new Set(prefixes || []);
+        let changed = 0;
+        overlays.forEach(function (entries, loc) {
+            let kind, text;
+            if (Object.prototype.hasOwnProperty.call(occupied, loc)) {
+                kind = 'ocupado';
+                text = occupied[loc];
+            } else {
+                const match = /^(C\d+)-/.exec(loc.toUpperCase());
+                kind = match && inUse.has(match[1]) ? 'en_uso' : 'libre';
+                text = 'Ubicación: ' + loc + '\nEstado: Libre';
+            }
+            const signature = kind + '|' + text;
+            if (lastState.get(loc) === signature) return;
+            lastState.set(loc, signature);
+            changed += 1;
+            entries.forEach(function (entry) {
+                if (entry.rect) {
+                    entry.rect.setAttribute('fill', COLORS[kind][0]);
+                    entry.rect.setAttribute('stroke', COLORS[kind][1]);
+                }
+                if (entry.title) entry.title.textContent = text;
+            });
+        });
+        return changed;
+    }
+
+    function gunzipBase64(data) {
+        // SVG precomprimido en el servidor (gzip + base64)
+        const bytes = Uint8Array.from(atob(data), function (c) { return c.charCodeAt(0); });
+        const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+        return new Response(stream).text();
+    }
+
+    function onRender(args) {
+        latestArgs = args;
+        const height = args.height || 750;
+        if (height !== lastHeight) {
+            lastHeight = height;
+            container.style.height = height + 'px';
+            send('streamlit:setFrameHeight', { height: height + 4 });
+        }
+
+        if (args.layout_key !== layoutKey) {
+            if (pendingKey === args.layout_key) return;
+            if (args.svg_gz) {
+                if (typeof DecompressionStream === 'undefined') {
+                    // Navegador sin DecompressionStream: pedir el SVG sin comprimir
+                    plainOnly = true;
+                    setValue({ layout_key: null, plain: true });
+                    return;
+                }
+                pendingKey = args.layout_key;
+                updateDebug('Descomprimiendo layout...');
+                gunzipBase64(args.svg_gz).then(function (markup) {
+                    pendingKey = null;
+                    if (!loadSvg(markup, args.layout_key, args.blocks)) return;
+                    setValue({ layout_key: args.layout_key, plain: plainOnly });
+                    onRender(latestArgs);
+                }).catch(function (err) {
+                    pendingKey = null;
+                    console.error('Critical SVG Error:', err);
+                    plainOnly = true;
+                    setValue({ layout_key: null, plain: true });
+                });
+                return;
+            }
+            if (!args.svg) {
+                // Iframe nuevo o layout distinto: pedir el SVG estático
+                updateDebug('Solicitando layout...');
+                setValue({ layout_key: null, plain: plainOnly });
+                return;
+            }
+            if (!loadSvg(args.svg, args.layout_key, args.blocks)) return;
+            setValue({ layout_key: args.layout_key, plain: plainOnly });
+        }
+
+        const changed = applyState(args.occupied || {}, args.prefixes);
+        applyBlockFill(args.block_fill || {});
+        updateDebug('SVG listo · ' + overlays.size + ' ubicaciones · ' + changed + ' actualizadas');
+        if (Boolean(args.lod) !== lod) {
+            lod = Boolean(args.lod);
+        }
+        scheduleView();
+    }
+
+    window.addEventListener('message', function (event) {
+        if (event.data && event.data.type === 'streamlit:render') {
+            try {
+                onRender(event.data.args || {});
+            } catch (err) {
+                console.error('Critical SVG Error:', err);
+                updateDebug('ERROR: ' + err.message, true);
+            }
+        }
+    });
+
+    bindPanZoom();
+    send('streamlit:componentReady', { apiVersion: 1 });
+})();
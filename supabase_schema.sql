@@ -0,0 +1,218 @@
+-- Esquema de Supabase usado por pt.py (tabla warehouse_occupancy)
+
+-- Marca de agua para la sincronización incremental: cada alta o cambio de la fila
+-- actualiza updated_at, y la app solo descarga filas posteriores a su cursor (updated_at, id).
+-- clock_timestamp() es la hora de la escritura, no la del commit: la app relee los últimos
+-- DELTA_SYNC_OVERLAP segundos antes del cursor y descarta por id las filas ya aplicadas.
+alter table warehouse_occupancy
+    add column if not exists updated_at timestamptz not null default now();
+
+create index if not exists warehouse_occupancy_updated_at_idx
+    on warehouse_occupancy (updated_at, id);
+
+create or replace function warehouse_occupancy_set_updated_at()
+returns trigger as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists warehouse_occupancy_updated_at on warehouse_occupancy;
+create trigger warehouse_occupancy_updated_at
+    before insert or update on warehouse_occupancy
+    for each row execute function warehouse_occupancy_set_updated_at();
+
+-- Llave de idempotencia de la bitácora local de escaneos: el hilo de subida manda cada
+-- lote a claim_occupancy_slots (más abajo), que primero busca la llave y regresa el slot
+-- ya asignado; si no existe, inserta reclamando el slot bajo warehouse_occupancy_slot_uk.
+-- Este índice único garantiza que un lote reenviado no duplique filas.
+alter table warehouse_occupancy
+    add column if not exists idempotency_key text;
+
+create unique index if not exists warehouse_occupancy_idempotency_key_uk
+    on warehouse_occupancy (idempotency_key);
+
+-- Verificación caja por caja: una fila por pallet con el bitset de seriales verificados
+-- (base64, bit i = i-ésimo serial del pallet en el packing list). La app guarda en lote
+-- con merge_box_verification; project_id es el hash del packing list.
+create table if not exists box_verification (
+    project_id text not null,
+    pallet_number text not null,
+    camion text,
+    bits text not null default '',
+    verified_count integer not null default 0,
+    total_count integer not null default 0,
+    updated_at timestamptz not null default now(),
+    primary key (project_id, pallet_number)
+);
+
+-- Guarda la verificación combinando (OR) cada bitset con el guardado, así dos tabletas
+-- que verifican el mismo pallet no se pisan el avance. El conteo sale del bitset
+-- combinado, que se regresa para que la app lo adopte.
+create or replace function merge_box_verification(p_rows jsonb)
+returns table (merged_pallet text, merged_bits text, merged_count integer)
+language plpgsql as $$
+declare
+    r jsonb;
+    v_new bytea;
+    v_old bytea;
+    v_swap bytea;
+    i integer;
+begin
+    for r in select value from jsonb_array_elements(p_rows) loop
+        merged_pallet := r->>'pallet_number';
+        v_new := decode(coalesce(r->>'bits', ''), 'base64');
+
+        -- La fila existe antes del bloqueo: dos primeros guardados del mismo pallet no chocan
+        insert into box_verification (project_id, pallet_number)
+        values (r->>'project_id', merged_pallet)
+        on conflict do nothing;
+        select decode(b.bits, 'base64') into v_old
+            from box_verification b
+            where b.project_id = r->>'project_id' and b.pallet_number = merged_pallet
+            for update;
+
+        if length(v_old) > length(v_new) then
+            v_swap := v_old;
+            v_old := v_new;
+            v_new := v_swap;
+        end if;
+        for i in 0 .. length(v_old) - 1 loop
+            v_new := set_byte(v_new, i, get_byte(v_new, i) | get_byte(v_old, i));
+        end loop;
+
+        merged_bits := replace(encode(v_new, 'base64'), E'\n', '');
+        merged_count := bit_count(v_new);
+        update box_verification b
+            set camion = coalesce(r->>'camion', b.camion),
+                bits = merged_bits,
+                verified_count = merged_count,
+                total_count = coalesce((r->>'total_count')::integer, b.total_count),
+                updated_at = now()
+            where b.project_id = r->>'project_id' and b.pallet_number = merged_pallet;
+        return next;
+    end loop;
+end;
+$$;
+
+-- Asignación atómica de slots: un slot de una ubicación solo puede tenerlo un pallet
+-- escaneado (los entregados ya no cuentan). Si ya hay slots duplicados de antes, hay
+-- que resolverlos antes de crear el índice.
+create unique index if not exists warehouse_occupancy_slot_uk
+    on warehouse_occupancy (ubicacion, slot)
+    where status = 'escaneado';
+
+-- Inserta los escaneos de la bitácora eligiendo el slot en el servidor. Cada fila trae
+-- el slot que propuso la app; si otro escáner ya lo ganó se toma el siguiente libre de
+-- la ubicación, y claimed_slot = null si ya no queda ninguno. Un lote reenviado regresa
+-- el slot que ya se asignó a cada idempotency_key.
+create or replace function claim_occupancy_slots(p_rows jsonb, p_slots integer default 2)
+returns table (claimed_key text, claimed_slot integer)
+language plpgsql as $$
+declare
+    r jsonb;
+    v_slot integer;
+    v_preferred integer;
+begin
+    for r in select value from jsonb_array_elements(p_rows) loop
+        claimed_key := r->>'idempotency_key';
+        claimed_slot := null;
+
+        select o.slot into claimed_slot
+            from warehouse_occupancy o
+            where o.idempotency_key = claimed_key;
+        if found then
+            return next;
+            continue;
+        end if;
+
+        v_preferred := coalesce((r->>'slot')::integer, 1);
+        for v_slot in select s from generate_series(1, p_slots) s order by s <> v_preferred, s loop
+            begin
+                insert into warehouse_occupancy
+                    (ubicacion, camion, pallet_number, slot, project_id, status, idempotency_key)
+                values (
+                    nullif(r->>'ubicacion', ''), r->>'camion', r->>'pallet_number', v_slot,
+                    coalesce(r->>'project_id', 'default'), coalesce(r->>'status', 'escaneado'), claimed_key
+                );
+                claimed_slot := v_slot;
+                exit;
+            exception when unique_violation then
+                -- Slot ganado por otro escáner, o la misma llave entró en paralelo
+                select o.slot into claimed_slot
+                    from warehouse_occupancy o
+                    where o.idempotency_key = claimed_key;
+                exit when found;
+            end;
+        end loop;
+        return next;
+    end loop;
+end;
+$$;
+
+-- Entregas: las filas de un camión entregado salen de warehouse_occupancy al histórico,
+-- así la tabla activa solo tiene pallets escaneados y la recarga no crece con lo embarcado.
+-- El estado "entregado" se lee de delivered_summary (una fila por camión con sus pallets).
+-- El histórico copia las columnas de warehouse_occupancy y agrega delivered_at al final.
+create table if not exists warehouse_occupancy_history (like warehouse_occupancy including defaults);
+
+alter table warehouse_occupancy_history
+    add column if not exists delivered_at timestamptz not null default now();
+
+create index if not exists warehouse_occupancy_history_camion_idx
+    on warehouse_occupancy_history (camion);
+
+create table if not exists delivered_summary (
+    project_id text not null,
+    camion text not null,
+    pallets text[] not null default '{}',
+    updated_at timestamptz not null default now(),
+    primary key (project_id, camion)
+);
+
+create index if not exists delivered_summary_updated_at_idx
+    on delivered_summary (updated_at);
+
+create index if not exists warehouse_occupancy_status_idx
+    on warehouse_occupancy (status, id);
+
+-- Archiva los pallets entregados y los suma al resumen del camión en una transacción
+create or replace function archive_delivered_pallets(p_camion text, p_pallets text[], p_project_id text default 'default')
+returns integer
+language plpgsql as $$
+declare
+    v_moved integer;
+begin
+    with moved as (
+        delete from warehouse_occupancy
+        where pallet_number = any(p_pallets)
+        returning *
+    )
+    insert into warehouse_occupancy_history
+    select moved.*, now() from moved;
+    get diagnostics v_moved = row_count;
+
+    insert into delivered_summary as s (project_id, camion, pallets, updated_at)
+    values (p_project_id, p_camion, p_pallets, clock_timestamp())
+    on conflict (project_id, camion) do update
+        set pallets = array(select distinct unnest(s.pallets || excluded.pallets)),
+            updated_at = clock_timestamp();
+    return v_moved;
+end;
+$$;
+
+-- Migración única: archivar lo que ya estaba marcado como entregado y armar su resumen
+with moved as (
+    delete from warehouse_occupancy
+    where status = 'entregado'
+    returning *
+)
+insert into warehouse_occupancy_history
+select moved.*, now() from moved;
+
+insert into delivered_summary (project_id, camion, pallets)
+select coalesce(project_id, 'default'), camion, array_agg(distinct pallet_number)
+from warehouse_occupancy_history
+group by 1, 2
+on conflict (project_id, camion) do nothing;
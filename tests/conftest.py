@@ -0,0 +1,29 @@
+"""Carga las definiciones de pt.py para las pruebas sin ejecutar la interfaz de Streamlit"""
+import ast
+import os
+import types
+
+import pytest
+
+PT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'pt.py')
+
+
+def load_definitions(path=PT_PATH):
+    """Imports, funciones, clases y asignaciones con nombre en mayúscula de pt.py; lo demás es la app"""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    body = [
+        node for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.ClassDef))
+        or (isinstance(node, ast.Assign)
+            and all(isinstance(t, ast.Name) and t.id[0].isupper() for t in node.targets))
+    ]
+    module = types.ModuleType('pt')
+    module.__file__ = path
+    exec(compile(ast.Module(body=body, type_ignores=[]), path, 'exec'), module.__dict__)
+    return module
+
+
+@pytest.fixture(scope='session')
+def pt():
+    return load_definitions()
@@ -0,0 +1,315 @@
+"""Cliente falso de Supabase: tablas en memoria con el subconjunto de PostgREST que usa pt.py"""
+import base64
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec='microseconds')
+
+
+def _comparable(value):
+    """Números y fechas ISO se comparan por valor, como en Postgres"""
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value)
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).replace(tzinfo=None).timestamp()
+    except ValueError:
+        return text
+
+
+OPERATORS = {
+    'eq': lambda a, b: a == b,
+    'gt': lambda a, b: a > b,
+    'gte': lambda a, b: a >= b,
+    'lt': lambda a, b: a < b,
+    'lte': lambda a, b: a <= b,
+}
+
+
+def _condition(column, op, value):
+    raw = value.strip('"') if isinstance(value, str) else value
+    value = _comparable(raw)
+    compare = OPERATORS[op]
+
+    def check(row):
+        current = row.get(column)
+        if current is None:
+            return False
+        comparable = _comparable(current)
+        if isinstance(comparable, str) != isinstance(value, str):
+            return compare(str(current), str(raw))
+        return compare(comparable, value)
+    return check
+
+
+def _split_terms(text):
+    terms, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            terms.append(text[start:i])
+            start = i + 1
+    terms.append(text[start:])
+    return terms
+
+
+def _parse_logic(text, combine=any):
+    """Filtro `or=(...)` de PostgREST: col.op.valor, and(...) y or(...) anidados"""
+    checks = []
+    for term in _split_terms(text):
+        nested = re.fullmatch(r'(and|or)\((.*)\)', term)
+        if nested:
+            checks.append(_parse_logic(nested.group(2), all if nested.group(1) == 'and' else any))
+        else:
+            column, op, value = term.split('.', 2)
+            checks.append(_condition(column, op, value))
+    return lambda row: combine(check(row) for check in checks)
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.columns = None
+        self.count = None
+        self.filters = []
+        self.orders = []
+        self.offset = 0
+        self.limit_rows = None
+        self.upsert_rows = None
+
+    def select(self, columns='*', count=None):
+        self.columns = None if columns == '*' else [c.strip() for c in columns.split(',')]
+        self.count = count
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((f'{column}.eq.{value}', _condition(column, 'eq', value)))
+        return self
+
+    def gt(self, column, value):
+        self.filters.append((f'{column}.gt.{value}', _condition(column, 'gt', value)))
+        return self
+
+    def lte(self, column, value):
+        self.filters.append((f'{column}.lte.{value}', _condition(column, 'lte', value)))
+        return self
+
+    def or_(self, text):
+        self.filters.append((f'or({text})', _parse_logic(text)))
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.offset, self.limit_rows = start, end - start + 1
+        return self
+
+    def limit(self, n):
+        self.limit_rows = n
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False):
+        self.upsert_rows = (rows if isinstance(rows, list) else [rows], on_conflict.split(','), ignore_duplicates)
+        return self
+
+    def execute(self):
+        with self.client.lock:
+            self.client.requests += 1
+            if self.upsert_rows is not None:
+                return FakeResponse(self.client.upsert(self.table, *self.upsert_rows))
+            rows = self.client.matching(self.table, self.filters, self.orders)
+            count = len(rows) if self.count == 'exact' else None
+            limit = self.limit_rows
+            if self.client.max_rows is not None:
+                limit = self.client.max_rows if limit is None else min(limit, self.client.max_rows)
+            rows = rows[self.offset:None if limit is None else self.offset + limit]
+            if self.columns:
+                rows = [{c: row.get(c) for c in self.columns} for row in rows]
+            else:
+                rows = [dict(row) for row in rows]
+        return FakeResponse(rows, count)
+
+
+class FakeRpc:
+    def __init__(self, client, function, params):
+        self.client = client
+        self.function = function
+        self.params = params
+
+    def execute(self):
+        with self.client.lock:
+            self.client.requests += 1
+            return FakeResponse(self.function(**self.params))
+
+
+class FakeSupabase:
+    """Tablas en memoria; max_rows recorta cada respuesta como el max-rows de PostgREST.
+
+    Quien modifique `tables` directamente después de consultar debe llamar changed().
+    """
+
+    def __init__(self, max_rows=None):
+        self.tables = {}
+        self.max_rows = max_rows
+        self.lock = threading.RLock()
+        self.requests = 0
+        self._next_id = 1
+        self._changes = 0
+        self._matching = {}  # (tabla, filtros, orden) -> filas; se invalida con cada escritura
+
+    def matching(self, table, filters, orders):
+        """Filas filtradas y ordenadas; las páginas de una misma consulta no se recalculan.
+
+        Los rangos de id (paginación por llave) se cortan con bisect sobre la consulta sin
+        ellos, para que cada página no vuelva a recorrer toda la tabla.
+        """
+        ranges = [text.split('.', 2) for text, _ in filters if re.match(r'id\.(gt|gte|lt|lte)\.', text)]
+        base = [item for item in filters if not re.match(r'id\.(gt|gte|lt|lte)\.', item[0])]
+        key = (table, tuple(text for text, _ in base), tuple(orders), self._changes)
+        cached = self._matching.get(key)
+        if cached is None:
+            rows = [row for row in self.tables.setdefault(table, [])
+                    if all(check(row) for _, check in base)]
+            for column, desc in reversed(orders):
+                rows.sort(key=lambda row: _comparable(row.get(column)), reverse=desc)
+            ids = [row['id'] for row in rows] if ranges and orders == [('id', False)] else None
+            cached = (rows, ids)
+            self._matching = {key: cached}
+        rows, ids = cached
+        if not ranges:
+            return rows
+        if ids is None:
+            return [row for row in rows if all(check(row) for _, check in filters)]
+        lo, hi = 0, len(rows)
+        for _, op, value in ranges:
+            if op == 'gt':
+                lo = max(lo, bisect_right(ids, int(value)))
+            elif op == 'gte':
+                lo = max(lo, bisect_left(ids, int(value)))
+            elif op == 'lt':
+                hi = min(hi, bisect_left(ids, int(value)))
+            else:
+                hi = min(hi, bisect_right(ids, int(value)))
+        return rows[lo:hi]
+
+    def changed(self):
+        self._changes += 1
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        return FakeRpc(self, getattr(self, f'rpc_{name}'), params)
+
+    def rpc_claim_occupancy_slots(self, p_rows, p_slots=2):
+        """Igual que claim_occupancy_slots de supabase_schema.sql"""
+        occupancy = self.tables.setdefault('warehouse_occupancy', [])
+        result = []
+        for r in p_rows:
+            key = r['idempotency_key']
+            existing = next((row for row in occupancy if row.get('idempotency_key') == key), None)
+            if existing is not None:
+                result.append({'claimed_key': key, 'claimed_slot': existing['slot']})
+                continue
+            ubicacion = r.get('ubicacion') or None
+            taken = {row['slot'] for row in occupancy
+                     if ubicacion is not None and row.get('ubicacion') == ubicacion and row.get('status') == 'escaneado'}
+            preferred = int(r.get('slot') or 1)
+            claimed = None
+            for slot in sorted(range(1, p_slots + 1), key=lambda s: (s != preferred, s)):
+                if slot not in taken:
+                    self.insert('warehouse_occupancy', {
+                        'ubicacion': ubicacion, 'camion': r.get('camion'), 'pallet_number': r.get('pallet_number'),
+                        'slot': slot, 'project_id': r.get('project_id') or 'default',
+                        'status': r.get('status') or 'escaneado', 'idempotency_key': key,
+                    })
+                    claimed = slot
+                    break
+            result.append({'claimed_key': key, 'claimed_slot': claimed})
+        return result
+
+    def rpc_merge_box_verification(self, p_rows):
+        """Igual que merge_box_verification de supabase_schema.sql"""
+        stored = self.tables.setdefault('box_verification', [])
+        result = []
+        for r in p_rows:
+            current = next((row for row in stored if row['project_id'] == r['project_id']
+                            and row['pallet_number'] == r['pallet_number']), None)
+            if current is None:
+                current = self.insert('box_verification', {
+                    'project_id': r['project_id'], 'pallet_number': r['pallet_number'], 'camion': None,
+                    'bits': '', 'verified_count': 0, 'total_count': 0,
+                })
+            new, old = base64.b64decode(r.get('bits') or ''), base64.b64decode(current['bits'])
+            value = int.from_bytes(new, 'little') | int.from_bytes(old, 'little')
+            bits = base64.b64encode(value.to_bytes(max(len(new), len(old)), 'little')).decode('ascii')
+            current.update(
+                camion=r.get('camion') or current['camion'], bits=bits, verified_count=value.bit_count(),
+                total_count=r.get('total_count', current['total_count']), updated_at=now_iso(),
+            )
+            result.append({'merged_pallet': r['pallet_number'], 'merged_bits': bits,
+                           'merged_count': value.bit_count()})
+        self.changed()
+        return result
+
+    def rpc_archive_delivered_pallets(self, p_camion, p_pallets, p_project_id='default'):
+        """Igual que archive_delivered_pallets de supabase_schema.sql"""
+        pallets = set(p_pallets)
+        occupancy = self.tables.setdefault('warehouse_occupancy', [])
+        moved = [row for row in occupancy if row.get('pallet_number') in pallets]
+        self.tables['warehouse_occupancy'] = [row for row in occupancy if row.get('pallet_number') not in pallets]
+        history = self.tables.setdefault('warehouse_occupancy_history', [])
+        history.extend(dict(row, delivered_at=now_iso()) for row in moved)
+        summary = self.tables.setdefault('delivered_summary', [])
+        current = next((row for row in summary
+                        if row['project_id'] == p_project_id and row['camion'] == p_camion), None)
+        if current is None:
+            summary.append({'project_id': p_project_id, 'camion': p_camion,
+                            'pallets': sorted(pallets), 'updated_at': now_iso()})
+        else:
+            current.update(pallets=sorted(pallets | set(current['pallets'])), updated_at=now_iso())
+        self.changed()
+        return len(moved)
+
+    def insert(self, table, row):
+        with self.lock:
+            row = dict(row)
+            if table == 'warehouse_occupancy':
+                row.setdefault('id', self._next_id)
+                self._next_id = max(self._next_id, row['id']) + 1
+            row.setdefault('updated_at', now_iso())
+            self.tables.setdefault(table, []).append(row)
+            self.changed()
+            return row
+
+    def upsert(self, table, rows, keys, ignore_duplicates):
+        stored = self.tables.setdefault(table, [])
+        index = {tuple(row.get(k) for k in keys): row for row in stored}
+        for row in rows:
+            existing = index.get(tuple(row.get(k) for k in keys))
+            if existing is None:
+                index[tuple(row.get(k) for k in keys)] = self.insert(table, row)
+            elif not ignore_duplicates:
+                existing.update(row, updated_at=now_iso())
+                self.changed()
+        return rows
@@ -0,0 +1,102 @@
+import sqlite3
+import threading
+
+TABLETS = 6
+SCANS_PER_TABLET = 20
+LOCATIONS = [f"A{i}" for i in range(1, 6)]
+
+
+def scan(camion, pallet, ubicacion, slot=1):
+    return {
+        'ubicacion': ubicacion,
+        'camion': camion,
+        'pallet_number': pallet,
+        'slot': slot,
+        'project_id': 'default',
+        'status': 'escaneado',
+    }
+
+
+def test_concurrent_claims_never_share_a_slot(pt, tmp_path):
+    """Varias tabletas proponen el mismo slot a la vez; el almacenamiento reparte sin duplicar"""
+    path = str(tmp_path / 'occupancy.db')
+    pt.SQLiteStorage(path)
+    barrier = threading.Barrier(TABLETS)
+    rejected, errors = [], []
+
+    def tablet(n):
+        try:
+            # Conexión y bitácora propias, como una tableta con su propio proceso
+            storage = pt.SQLiteStorage(path)
+            journal = pt.ScanJournal(str(tmp_path / f'journal_{n}.db'))
+            journal.on_claimed = lambda row, slot: slot is None and rejected.append(row['pallet_number'])
+            for i in range(SCANS_PER_TABLET):
+                journal.append(scan(str(n), f"{n}-{i}", LOCATIONS[i % len(LOCATIONS)]))
+            barrier.wait()
+            while journal.flush_once(storage, batch_size=3):
+                pass
+            assert journal.pending_count() == 0
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=tablet, args=(n,)) for n in range(TABLETS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+    conn = sqlite3.connect(path)
+    rows = conn.execute(
+        "SELECT ubicacion, slot, pallet_number FROM warehouse_occupancy WHERE status = 'escaneado'"
+    ).fetchall()
+    placed = {(ubicacion, slot) for ubicacion, slot, _ in rows}
+    assert len(placed) == len(rows) == len(LOCATIONS) * pt.SLOTS_POR_UBICACION
+    # Cada escaneo quedó en un slot o fue rechazado, nunca ambos ni ninguno
+    assert len(rows) + len(rejected) == TABLETS * SCANS_PER_TABLET
+    assert not {pallet for _, _, pallet in rows} & set(rejected)
+
+
+def test_resent_batch_keeps_its_slot(pt, tmp_path):
+    storage = pt.SQLiteStorage(str(tmp_path / 'occupancy.db'))
+    rows = [dict(scan('1', 'P1', 'A1'), idempotency_key='k1'),
+            dict(scan('1', 'P2', 'A1'), idempotency_key='k2')]
+
+    first = storage.claim_slots(rows)
+    again = storage.claim_slots(rows)
+
+    assert first == again == {'k1': 1, 'k2': 2}
+    assert storage._rows('SELECT COUNT(*) AS n FROM warehouse_occupancy')[0]['n'] == 2
+
+
+class FlakyStorage:
+    """Falla como un 502 las primeras `failures` llamadas y luego delega"""
+
+    def __init__(self, storage, failures):
+        self.storage = storage
+        self.failures = failures
+
+    def is_data_error(self, error):
+        return self.storage.is_data_error(error)
+
+    def claim_slots(self, rows):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('502 Bad Gateway')
+        return self.storage.claim_slots(rows)
+
+
+def test_transient_error_keeps_scans_pending(pt, tmp_path):
+    storage = pt.SQLiteStorage(str(tmp_path / 'occupancy.db'))
+    journal = pt.ScanJournal(str(tmp_path / 'journal.db'))
+    for i in range(3):
+        journal.append(scan('1', f"P{i}", 'A1'))
+    flaky = FlakyStorage(storage, failures=1)
+
+    assert not journal.flush_all(flaky)
+    assert journal.pending_count() == 3
+    assert journal._conn.execute("SELECT COUNT(*) FROM scan_journal WHERE status = 'rechazado'").fetchone()[0] == 0
+
+    assert journal.flush_all(flaky)
+    assert journal.pending_count() == 0
+    assert storage._rows('SELECT COUNT(*) AS n FROM warehouse_occupancy')[0]['n'] == 2
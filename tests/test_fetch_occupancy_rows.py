@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+
+from fake_supabase import FakeSupabase
+
+TOTAL_ROWS = 120_000
+
+
+def make_client(total=TOTAL_ROWS, **kwargs):
+    client = FakeSupabase(**kwargs)
+    client.tables['warehouse_occupancy'] = [
+        {
+            'id': i,
+            'camion': str(i // 50),
+            'pallet_number': str(i),
+            'ubicacion': f"A{i % 400}",
+            'slot': 1 + i % 2,
+            # Uno de cada diez ya entregado: el filtro de status va al servidor
+            'status': 'entregado' if i % 10 == 0 else 'escaneado',
+            'updated_at': '2026-01-01T00:00:00+00:00',
+        }
+        for i in range(1, total + 1)
+    ]
+    return client
+
+
+def collect(pt, client, **kwargs):
+    ids, threads = [], set()
+
+    def on_rows(rows):
+        threads.add(threading.get_ident())
+        ids.extend(row['id'] for row in rows)
+
+    stats = pt.fetch_occupancy_rows(client, on_rows, **kwargs)
+    return ids, threads, stats
+
+
+def test_reads_every_row_once(pt):
+    client = make_client()
+    ids, threads, stats = collect(pt, client)
+
+    assert len(ids) == TOTAL_ROWS
+    assert set(ids) == set(range(1, TOTAL_ROWS + 1))
+    assert stats['rows'] == stats['total'] == TOTAL_ROWS
+    # Cada tramo de ids puede cerrar con una página vacía o corta
+    assert stats['pages'] <= TOTAL_ROWS // pt.OCCUPANCY_PAGE_SIZE + pt.OCCUPANCY_FETCH_WORKERS
+    # on_rows corre en el hilo que llama, aunque las páginas se pidan en paralelo
+    assert threads == {threading.get_ident()}
+
+
+def test_status_filter_applies_to_count(pt):
+    client = make_client()
+    ids, _, stats = collect(pt, client, status='escaneado')
+
+    expected = {i for i in range(1, TOTAL_ROWS + 1) if i % 10}
+    assert len(ids) == len(expected) == stats['total']
+    assert set(ids) == expected
+
+
+@pytest.mark.parametrize('max_rows', [700, 1000, 999])
+def test_server_page_clamp_does_not_skip_rows(pt, max_rows):
+    client = make_client(max_rows=max_rows)
+    ids, _, stats = collect(pt, client, page_size=5000)
+
+    assert len(ids) == TOTAL_ROWS
+    assert set(ids) == set(range(1, TOTAL_ROWS + 1))
+    assert stats['pages'] <= -(-TOTAL_ROWS // max_rows) + pt.OCCUPANCY_FETCH_WORKERS
+
+
+def test_deliveries_during_fetch_do_not_skip_rows(pt):
+    """Una entrega borra filas a media recarga: ninguna fila que sigue en la tabla se pierde"""
+    client = make_client()
+    delivered = {str(i) for i in range(1, TOTAL_ROWS + 1) if i % 7 == 0}
+    ids, calls = [], []
+
+    def on_rows(rows):
+        ids.extend(row['id'] for row in rows)
+        calls.append(len(rows))
+        if len(calls) in (1, 3):
+            client.rpc_archive_delivered_pallets('T1', sorted(delivered)[len(calls) // 2::2])
+
+    stats = pt.fetch_occupancy_rows(client, on_rows, page_size=1000)
+    remaining = {row['id'] for row in client.tables['warehouse_occupancy']}
+    assert len(remaining) == TOTAL_ROWS - len(delivered)
+    assert remaining <= set(ids)
+    assert len(ids) == len(set(ids)) == stats['rows']
+
+
+def test_small_and_empty_tables(pt):
+    ids, _, stats = collect(pt, make_client(total=0))
+    assert ids == [] and stats['pages'] == 1
+
+    ids, _, stats = collect(pt, make_client(total=3))
+    assert sorted(ids) == [1, 2, 3] and stats['pages'] == 1
@@ -0,0 +1,80 @@
+"""parse_packing_stream debe dar lo mismo que la lectura completa con pandas"""
+from io import BytesIO
+
+import openpyxl
+import pandas as pd
+import pytest
+
+HEADER = ['Pallet number', 'Box number', 'Serial number']
+
+
+def workbook(rows, header=HEADER, merges=()):
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.title = 'All number'
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    for cells in merges:
+        sheet.merge_cells(cells)
+    data = BytesIO()
+    book.save(data)
+    return data.getvalue()
+
+
+def records(frame):
+    return [tuple(None if pd.isna(v) else v for v in row) for row in frame.itertuples(index=False)]
+
+
+CASES = {
+    'texto': [['P1', 'B1', 'S1'], [None, None, 'S2'], ['P2', 'B2', 'S3']],
+    'numerico': [[1, 'B1', 'S1'], [1, 'B1', 'S2'], [2, 'B2', 'S3'], [10, 3, 4]],
+    'numerico_con_vacios': [[1, 'B1', 'S1'], [None, 'B2', 'S2'], [2, None, 'S3']],
+    'flotantes': [[1.5, 'B1', 'S1'], [2.0, 'B2', 'S2']],
+    'primera_fila_sin_pallet': [[None, 'B0', 'S0'], [None, None, 'S1'], [7, 'B1', 'S2'], [None, 'B2', 'S3']],
+    'sin_ningun_pallet': [[None, 'B1', 'S1'], [None, 'B2', 'S2']],
+    'filas_vacias': [['P1', 'B1', 'S1'], [None, None, None], ['P2', 'B2', 'S2'], [None, None, None]],
+    'mixto': [['P1', 'B1', 'S1'], [3, 'B2', 'S2'], [None, 'B3', None]],
+}
+
+
+@pytest.mark.parametrize('rows', CASES.values(), ids=CASES.keys())
+def test_stream_matches_pandas(pt, rows):
+    data = workbook(rows)
+    stream_df, stream_summary = pt.parse_packing_stream(data)
+    pandas_df, pandas_summary = pt._parse_packing_pandas(data)
+
+    assert records(stream_df) == records(pandas_df)
+    assert records(stream_summary) == records(pandas_summary)
+    assert 'nan' not in set(stream_summary['Pallet number'])
+
+
+def test_merged_pallet_cells(pt):
+    """Celdas combinadas de Pallet/Box: solo la primera trae valor, el resto se rellena"""
+    rows = [[None, 'B0', 'S0'], [1, 'B1', 'S1'], [None, None, 'S2'], [None, 'B2', 'S3'], [2, 'B3', 'S4']]
+    data = workbook(rows, merges=['A3:A5', 'B3:B4'])
+    stream_df, stream_summary = pt.parse_packing_stream(data)
+    pandas_df, pandas_summary = pt._parse_packing_pandas(data)
+
+    assert records(stream_df) == records(pandas_df)
+    assert records(stream_summary) == records(pandas_summary)
+    assert list(stream_summary['Pallet number']) == ['1.0', '2.0']
+
+
+def test_columns_in_any_order(pt):
+    header = ['Serial number', 'Notas', 'Pallet number', 'Box number']
+    rows = [['S1', 'x', 'P1', 'B1'], ['S2', None, None, None], ['S3', 'y', 'P2', 'B2']]
+    data = workbook(rows, header=header)
+    stream_df, stream_summary = pt.parse_packing_stream(data)
+    pandas_df, pandas_summary = pt._parse_packing_pandas(data)
+
+    assert records(stream_df) == records(pandas_df)
+    assert records(stream_summary) == records(pandas_summary)
+
+
+def test_missing_column_is_an_error_in_both(pt):
+    data = workbook([['P1', 'S1']], header=['Pallet number', 'Serial number'])
+    with pytest.raises(ValueError):
+        pt.parse_packing_stream(data)
+    with pytest.raises(KeyError):
+        pt._parse_packing_pandas(data)
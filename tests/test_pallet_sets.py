@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+
+def test_without_copies_every_truck(pt):
+    scans = pt.ScannedPallets()
+    for pallet in ('1', '2', '3', 'P7'):
+        scans.add('T1', pallet)
+    scans.add('T2', '10')
+
+    remaining = scans.without(['10'])
+    remaining.add('T1', '4')
+    remaining.discard('T1', 'P7')
+
+    # La original (la que siguen leyendo otras sesiones) no cambia
+    assert ('T1', '4') not in scans and ('T1', 'P7') in scans
+    assert ('T2', '10') in scans and ('T2', '10') not in remaining
+    assert len(scans) == 5 and len(remaining) == 4
+
+    scans.add('T1', '5')
+    assert ('T1', '5') not in remaining
+
+
+def test_pallet_set_copy_is_independent(pt):
+    original = pt.PalletSet(['1', '2', '3', '10', 'P003'])
+    copy = original.copy()
+    copy.add('4')
+    copy.discard('P003')
+    copy.discard('2')
+
+    assert sorted(original) == sorted(['1', '2', '3', '10', 'P003'])
+    assert sorted(copy) == sorted(['1', '3', '4', '10'])
+    assert original.numbers.intervals() == [(1, 3), (10, 10)]
+
+
+def random_ints(rng):
+    # Bloques contiguos más sueltos, para que los intervalos se unan y se partan
+    values = set()
+    for _ in range(rng.randint(0, 6)):
+        start = rng.randint(0, 120)
+        values.update(range(start, start + rng.randint(1, 15)))
+    values.update(rng.randint(0, 150) for _ in range(rng.randint(0, 10)))
+    return values
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_range_set_matches_set(pt, seed):
+    rng = random.Random(seed)
+    a_values, b_values = random_ints(rng), random_ints(rng)
+    a, b = pt.RangeSet(a_values), pt.RangeSet(b_values)
+
+    for _ in range(60):
+        value = rng.randint(-2, 155)
+        if rng.random() < 0.6:
+            a.add(value)
+            a_values.add(value)
+        else:
+            a.discard(value)
+            a_values.discard(value)
+        assert len(a) == len(a_values)
+
+    assert list(a) == sorted(a_values)
+    assert all((v in a) == (v in a_values) for v in range(-3, 157))
+    assert list(a | b) == sorted(a_values | b_values)
+    assert list(a & b) == sorted(a_values & b_values)
+    assert list(a - b) == sorted(a_values - b_values)
+    assert list(b - a) == sorted(b_values - a_values)
+    assert len(a | b) == len(a_values | b_values)
+    assert a.isdisjoint(b) == a_values.isdisjoint(b_values)
+    # Los intervalos quedan unidos: ninguno toca al siguiente
+    intervals = a.intervals()
+    assert all(end + 1 < start for (_, end), (start, _) in zip(intervals, intervals[1:]))
+
+
+def random_pallet(rng):
+    number = rng.randint(0, 40)
+    return rng.choice([
+        str(number), str(number), f"0{number}", f"{number}.0", f"P{number:03d}", ' ' + str(number),
+    ])
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_pallet_set_matches_set(pt, seed):
+    rng = random.Random(seed)
+    a_values = {random_pallet(rng) for _ in range(rng.randint(0, 40))}
+    b_values = {random_pallet(rng) for _ in range(rng.randint(0, 40))}
+    a, b = pt.PalletSet(a_values), pt.PalletSet(b_values)
+
+    for _ in range(60):
+        pallet = random_pallet(rng)
+        if rng.random() < 0.6:
+            a.add(pallet)
+            a_values.add(pallet)
+        else:
+            a.discard(pallet)
+            a_values.discard(pallet)
+        assert len(a) == len(a_values)
+
+    assert sorted(a) == sorted(a_values)
+    probes = {random_pallet(rng) for _ in range(100)} | a_values | b_values
+    assert all((p in a) == (p in a_values) for p in probes)
+    assert sorted(a | b) == sorted(a_values | b_values)
+    assert sorted(a & b) == sorted(a_values & b_values)
+    assert sorted(a - b) == sorted(a_values - b_values)
+    assert sorted(a - b_values) == sorted(a_values - b_values)
+    assert a.isdisjoint(b) == a_values.isdisjoint(b_values)
+
+
+def test_pallet_text_identity(pt):
+    """'025', '25' y '25.0' son pallets distintos, como con los textos originales"""
+    pallets = pt.PalletSet(['25', '025', '25.0'])
+    assert len(pallets) == 3
+    assert sorted(pallets) == ['025', '25', '25.0']
+    assert pallets.numbers.intervals() == [(25, 25)]
+
+    pallets.discard('025')
+    assert '025' not in pallets and '25' in pallets and '25.0' in pallets
+    pallets.discard('25')
+    assert '25' not in pallets and '25.0' in pallets
+    assert sorted(pt.PalletSet(['25']) | pt.PalletSet(['025'])) == ['025', '25']
+    assert list(pt.PalletSet(['25', '025']) - pt.PalletSet(['25.0', '25'])) == ['025']
+    assert pt.PalletSet(['0']).numbers.intervals() == [(0, 0)] and '00' not in pt.PalletSet(['0'])
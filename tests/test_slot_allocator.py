@@ -0,0 +1,92 @@
+"""SlotAllocator conectado a la ocupación: reutiliza lo liberado y nunca repite un slot"""
+import random
+
+import pytest
+
+
+def layout(trucks=3, per_truck=5):
+    return [f"C{t}-{n}" for t in range(1, trucks + 1) for n in range(1, per_truck + 1)]
+
+
+def test_freed_slots_are_reused(pt):
+    occupancy = pt.OccupancyIndex()
+    allocator = pt.SlotAllocator(layout())
+    occupancy.attach(allocator)
+
+    assert allocator.place(1, 'C1') == ('C1-1', 1)
+    occupancy.add('C1-1', 'T1', '1', 1)
+    assert allocator.place(2, 'C1') == ('C1-1', 2)
+    occupancy.add('C1-1', 'T1', '2', 2)
+    assert allocator.place(2, 'C1') == (None, None)
+
+    occupancy.remove('T1', '1')
+    assert allocator.place(1, 'C1') == ('C1-1', 1)
+    occupancy.remove('T1', '2')
+    assert allocator.first_free_truck() == 'C1'
+
+
+def test_first_free_truck_follows_occupancy(pt):
+    occupancy = pt.OccupancyIndex()
+    allocator = pt.SlotAllocator(layout())
+    occupancy.add('C1-3', 'T1', '5', 1)
+    # Conectado después: toma la ocupación que ya había
+    occupancy.attach(allocator)
+    assert allocator.first_free_truck() == 'C2'
+
+    occupancy.add('C2-1', 'T2', '1', 1)
+    assert allocator.first_free_truck() == 'C3'
+    occupancy.remove('T1', '5')
+    assert allocator.first_free_truck() == 'C1'
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_no_slot_is_handed_out_twice(pt, seed):
+    rng = random.Random(seed)
+    occupancy = pt.OccupancyIndex()
+    allocator = pt.SlotAllocator(layout())
+    occupancy.attach(allocator)
+    placed = {}  # (camion, pallet) -> (ubicacion, slot)
+
+    for _ in range(300):
+        truck = f"C{rng.randint(1, 3)}"
+        pallet = rng.randint(1, 12)
+        key = (truck, str(pallet))
+        if key in placed and rng.random() < 0.5:
+            occupancy.remove(*key)
+            del placed[key]
+            continue
+        if key in placed:
+            continue
+        ubicacion, slot = allocator.place(pallet, truck)
+        if ubicacion is None:
+            # Sin lugar solo si la ubicación de ese pallet (o la primera del camión) está llena
+            target = pt.calcular_ubicacion_pallet(pallet, truck)
+            if target not in allocator.locations:
+                target = f"{truck}-1"
+            assert len([s for s in placed.values() if s[0] == target]) == pt.SLOTS_POR_UBICACION
+            continue
+        assert (ubicacion, slot) not in placed.values()
+        assert occupancy.add(ubicacion, *key, slot) is not None
+        placed[key] = (ubicacion, slot)
+
+    assert len(set(placed.values())) == len(placed) == len(occupancy)
+
+
+def test_store_keeps_only_recent_layout_allocators(pt):
+    store = pt.OccupancyStore()
+    layouts = {f"L{i}": layout(trucks=i + 1) for i in range(pt.LAYOUT_ALLOCATOR_ENTRIES + 2)}
+    allocators = {layout_id: store.allocator(layout_id, locations) for layout_id, locations in layouts.items()}
+
+    # Cada layout nuevo se construye una vez; pedir uno conectado regresa el mismo
+    last = list(layouts)[-1]
+    assert store.allocator(last, layouts[last]) is allocators[last]
+    assert len(store.occupancy._allocators) == pt.LAYOUT_ALLOCATOR_ENTRIES
+
+    # Los más viejos ya no siguen la ocupación; si se vuelven a pedir se reconstruyen al día
+    store.occupancy.add('C1-1', 'T1', '1', 1)
+    assert allocators['L0'].place(1, 'C1') == ('C1-1', 1)
+    rebuilt = store.allocator('L0', layouts['L0'])
+    assert rebuilt is not allocators['L0']
+    assert rebuilt.place(1, 'C1') == ('C1-1', 2)
+    assert allocators[last].place(1, 'C1') == ('C1-1', 2)
+    assert len(store.occupancy._allocators) == pt.LAYOUT_ALLOCATOR_ENTRIES
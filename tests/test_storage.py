@@ -0,0 +1,255 @@
+"""Misma suite para SupabaseStorage (cliente falso) y SQLiteStorage"""
+import base64
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from postgrest.exceptions import APIError
+
+from fake_supabase import FakeSupabase
+
+SEED_START = datetime(2026, 1, 1)
+
+
+def seed_timestamp(i):
+    """Filas viejas, un segundo entre cada una"""
+    return (SEED_START + timedelta(seconds=i)).isoformat(timespec='milliseconds')
+
+
+class NoJournal:
+    def pending(self):
+        return []
+
+
+class SQLiteBackend:
+    def __init__(self, pt, path):
+        self.pt = pt
+        self.path = path
+
+    def connect(self):
+        """Otra conexión al mismo archivo: otra tableta"""
+        return self.pt.SQLiteStorage(self.path)
+
+    def seed(self, rows):
+        """Filas viejas escritas directo en la tabla"""
+        conn = sqlite3.connect(self.path)
+        with conn:
+            conn.executemany(
+                'INSERT INTO warehouse_occupancy (ubicacion, camion, pallet_number, slot, project_id, status, '
+                'idempotency_key, updated_at) VALUES (:ubicacion, :camion, :pallet_number, :slot, '
+                "'default', 'escaneado', :idempotency_key, :updated_at)",
+                [dict(row, updated_at=seed_timestamp(i)) for i, row in enumerate(rows)]
+            )
+        conn.close()
+
+
+class SupabaseBackend:
+    def __init__(self, pt):
+        self.pt = pt
+        self.client = FakeSupabase()
+
+    def connect(self):
+        return self.pt.SupabaseStorage(self.client)
+
+    def seed(self, rows):
+        for i, row in enumerate(rows):
+            self.client.insert('warehouse_occupancy', dict(
+                row, project_id='default', status='escaneado', updated_at=seed_timestamp(i) + '+00:00'
+            ))
+
+
+@pytest.fixture(params=['sqlite', 'supabase'])
+def backend(request, pt, tmp_path):
+    if request.param == 'sqlite':
+        backend = SQLiteBackend(pt, str(tmp_path / 'occupancy.db'))
+    else:
+        backend = SupabaseBackend(pt)
+    backend.storage = backend.connect()
+    return backend
+
+
+def scan_row(camion, pallet, ubicacion, slot=1):
+    return {
+        'ubicacion': ubicacion,
+        'camion': str(camion),
+        'pallet_number': str(pallet),
+        'slot': slot,
+        'project_id': 'default',
+        'status': 'escaneado',
+        'idempotency_key': f"{camion}-{pallet}",
+    }
+
+
+def claim(storage, camion, pallet, ubicacion, slot=1):
+    row = scan_row(camion, pallet, ubicacion, slot)
+    return storage.claim_slots([row])[row['idempotency_key']]
+
+
+def fetch_all(storage):
+    rows = []
+    stats = storage.fetch_all(rows.extend)
+    return rows, stats
+
+
+def test_claim_takes_next_free_slot(backend):
+    storage = backend.storage
+    assert claim(storage, 'T1', 'P1', 'A1') == 1
+    assert claim(storage, 'T1', 'P2', 'A1') == 2
+    assert claim(storage, 'T1', 'P3', 'A1') is None
+    assert claim(storage, 'T1', 'P4', 'A2', slot=2) == 2
+
+    rows, stats = fetch_all(storage)
+    assert stats['rows'] == 3
+    assert {(r['pallet_number'], r['ubicacion'], r['slot']) for r in rows} == {
+        ('P1', 'A1', 1), ('P2', 'A1', 2), ('P4', 'A2', 2),
+    }
+
+
+def test_fetch_since_follows_cursor(backend):
+    storage = backend.storage
+    for i in range(5):
+        claim(storage, 'T1', f"P{i}", f"A{i}")
+
+    rows = storage.fetch_since(('', 0))
+    assert [r['pallet_number'] for r in rows] == [f"P{i}" for i in range(5)]
+    cursor = (rows[1]['updated_at'], rows[1]['id'])
+    assert [r['pallet_number'] for r in storage.fetch_since(cursor)] == ['P2', 'P3', 'P4']
+    assert len(storage.fetch_since(('', 0), limit=2)) == 2
+
+
+def test_deliver_archives_rows_and_merges_summary(backend):
+    storage = backend.storage
+    claim(storage, 'T1', 'P1', 'A1')
+    claim(storage, 'T1', 'P2', 'A2')
+    claim(storage, 'T2', 'P9', 'A3')
+
+    storage.deliver('T1', ['P1', 'P2'])
+    rows, _ = fetch_all(storage)
+    assert [r['pallet_number'] for r in rows] == ['P9']
+    summary = storage.fetch_delivered()
+    assert [(r['camion'], sorted(r['pallets'])) for r in summary] == [('T1', ['P1', 'P2'])]
+    located = {r['pallet_number']: (r['ubicacion'], r['slot']) for r in storage.delivered_locations('T1')}
+    assert located == {'P1': ('A1', 1), 'P2': ('A2', 1)}
+
+    # Una segunda entrega del mismo camión se suma al resumen; su updated_at no retrocede
+    # (puede repetirse dentro del mismo milisegundo, por eso la sincronización relee una ventana)
+    storage.deliver('T1', ['P3'])
+    merged = storage.fetch_delivered()
+    assert [(r['camion'], sorted(r['pallets'])) for r in merged] == [('T1', ['P1', 'P2', 'P3'])]
+    assert merged[0]['updated_at'] >= summary[0]['updated_at']
+    assert storage.fetch_delivered(merged[0]['updated_at']) == []
+
+
+def test_store_follows_other_tablet(backend, pt):
+    storage, other = backend.storage, backend.connect()
+    claim(other, 'T1', 'P1', 'A1')
+    store = pt.OccupancyStore()
+    assert store.refresh(storage, NoJournal())
+    assert ('T1', 'P1') in store.scans
+
+    claim(other, 'T1', 'P2', 'A1')
+    assert store.sync_delta(storage, NoJournal())
+    assert ('T1', 'P2') in store.scans
+    assert [a.pallet for a in store.occupancy.at('A1')] == ['P1', 'P2']
+
+    other.deliver('T1', ['P1', 'P2'])
+    version = store.version
+    assert store.sync_delta(storage, NoJournal())
+    assert ('T1', 'P1') not in store.scans and 'P1' in store.delivered
+    assert store.occupancy.at('A1') == ()
+    # Sin cambios nuevos la ventana de traslape no vuelve a aplicar nada
+    version = store.version
+    assert store.sync_delta(storage, NoJournal())
+    assert store.version == version
+
+
+def test_delta_sync_reads_only_changed_rows(backend, pt):
+    """La sincronización incremental no crece con la tabla: solo lee lo que cambió"""
+    backend.seed(scan_row('T1', i, f"B{i}") for i in range(20_000))
+    storage = backend.storage
+    store = pt.OccupancyStore()
+    assert store.refresh(storage, NoJournal())
+    assert store.sync_stats['rows'] == 20_000
+
+    other = backend.connect()
+    for i in range(10):
+        claim(other, 'T2', f"N{i}", f"C{i}")
+
+    read = []
+    fetch_since = storage.fetch_since
+
+    def counting_fetch_since(cursor, limit=pt.DELTA_SYNC_PAGE_SIZE):
+        rows = fetch_since(cursor, limit)
+        read.extend(rows)
+        return rows
+
+    storage.fetch_since = counting_fetch_since
+    version = store.version
+    assert store.sync_delta(storage, NoJournal())
+    new = [r['pallet_number'] for r in read if r['pallet_number'].startswith('N')]
+    assert sorted(new) == [f"N{i}" for i in range(10)]
+    # Además de lo nuevo solo se releen las filas de la ventana de traslape, y no se reaplican
+    assert len(read) - len(new) <= pt.DELTA_SYNC_OVERLAP + 1
+    assert store.version == version + 1
+    assert len(store.scans) == 20_010
+
+
+def test_data_errors_are_backend_specific(pt):
+    supabase = pt.SupabaseStorage(FakeSupabase())
+    assert supabase.is_data_error(APIError({'code': '23505', 'message': 'duplicate key'}))
+    assert supabase.is_data_error(APIError({'code': '22P02', 'message': 'invalid input'}))
+    assert not supabase.is_data_error(APIError({'code': 'PGRST301', 'message': 'JWT expired'}))
+    assert not supabase.is_data_error(APIError({}))
+    assert not supabase.is_data_error(ConnectionError('502'))
+
+    sqlite_storage = pt.SQLiteStorage(':memory:')
+    assert sqlite_storage.is_data_error(sqlite3.IntegrityError('UNIQUE constraint failed'))
+    assert not sqlite_storage.is_data_error(sqlite3.OperationalError('database is locked'))
+
+
+def test_same_timestamp_changes_are_not_skipped(pt, monkeypatch):
+    """Dos escrituras con el mismo updated_at (mismo milisegundo) se aplican las dos"""
+    import fake_supabase
+    monkeypatch.setattr(fake_supabase, 'now_iso', lambda: '2026-03-01T12:00:00.000000+00:00')
+    client = FakeSupabase()
+    storage, other = pt.SupabaseStorage(client), pt.SupabaseStorage(client)
+    claim(other, 'T0', 'P0', 'A0')
+    claim(other, 'T1', 'P1', 'A1')
+    other.deliver('T1', ['P1'])
+    store = pt.OccupancyStore()
+    assert store.refresh(storage, NoJournal())
+    store.refresh = lambda *args: pytest.fail('la sincronización incremental no debe recargar todo')
+
+    claim(other, 'T1', 'P2', 'A2')
+    other.deliver('T1', ['P2'])
+    claim(other, 'T2', 'P3', 'A3')
+    assert store.sync_delta(storage, NoJournal())
+
+    assert 'P2' in store.delivered
+    assert ('T2', 'P3') in store.scans
+    assert [a.pallet for a in store.occupancy.at('A3')] == ['P3']
+
+
+def verification_row(pallet, bits, total=16):
+    return {
+        'project_id': 'proyecto',
+        'pallet_number': pallet,
+        'camion': 'T1',
+        'bits': base64.b64encode(bytes(bits)).decode('ascii'),
+        'verified_count': sum(bin(b).count('1') for b in bits),
+        'total_count': total,
+    }
+
+
+def test_box_verification_merges_tablets(backend):
+    """Dos tabletas verifican seriales distintos del mismo pallet: se guardan ambos"""
+    storage, other = backend.storage, backend.connect()
+    merged = storage.save_box_verification([verification_row('P1', [0b0000_0011, 0]), verification_row('P2', [1, 0])])
+    assert [r['pallet_number'] for r in merged] == ['P1', 'P2']
+
+    merged = other.save_box_verification([verification_row('P1', [0b0000_0100, 0b1000_0000])])
+    assert [base64.b64decode(r['bits']) for r in merged] == [bytes([0b0000_0111, 0b1000_0000])]
+
+    saved = {r['pallet_number']: base64.b64decode(r['bits']) for r in storage.load_box_verification('proyecto')}
+    assert saved == {'P1': bytes([0b0000_0111, 0b1000_0000]), 'P2': bytes([1, 0])}
+    assert storage.load_box_verification('otro') == []
@@ -0,0 +1,62 @@
+"""Capa de color del layout: solo se regeneran las ubicaciones que cambiaron"""
+import time
+
+import pytest
+
+# (camiones físicos, ubicaciones por camión)
+LAYOUT_SIZES = [(5, 100), (20, 200), (50, 200)]
+
+
+def build_layout(pt, trucks, per_truck):
+    locations, shapes = pt.parse_svg_xml(pt.generate_benchmark_layout(trucks, per_truck, decorations_per_truck=5))
+    return locations, shapes
+
+
+def timed(render, snapshot):
+    t0 = time.perf_counter()
+    overlay = render(snapshot)
+    return overlay, (time.perf_counter() - t0) * 1000
+
+
+@pytest.mark.parametrize('trucks,per_truck', LAYOUT_SIZES)
+def test_overlay_renders_only_changed_locations(pt, trucks, per_truck):
+    locations, shapes = build_layout(pt, trucks, per_truck)
+    assert len(locations) == trucks * per_truck
+    cache = pt.SvgOverlayCache(locations, shapes)
+    occupancy = pt.OccupancyIndex()
+
+    _, full_ms = timed(cache.render, occupancy.snapshot())
+    assert cache.last_rendered == len(locations)
+
+    # El primer pallet de un camión físico cambia el color de todas sus ubicaciones
+    occupancy.add('C1-1', 'T1', 'P1', 1)
+    cache.render(occupancy.snapshot())
+    assert cache.last_rendered == per_truck
+
+    # Un segundo pallet en el mismo camión solo cambia su ubicación
+    occupancy.add('C1-2', 'T1', 'P2', 1)
+    snapshot = occupancy.snapshot()
+    overlay, incremental_ms = timed(cache.render, snapshot)
+    assert cache.last_rendered == 1
+    assert overlay == pt.SvgOverlayCache(locations, shapes).render(snapshot)
+
+    # Mismo snapshot: se reutiliza la capa completa
+    same, unchanged_ms = timed(cache.render, snapshot)
+    assert same is overlay and cache.last_rendered == 0
+
+    # Presupuesto relativo: un cambio o ninguno nunca cuesta lo que la capa completa
+    assert incremental_ms < full_ms and unchanged_ms < full_ms
+
+
+def test_map_state_grows_with_occupancy_not_layout(pt):
+    """El mapa solo recibe las ubicaciones ocupadas, sin importar el tamaño del layout"""
+    occupancy = pt.OccupancyIndex()
+    occupancy.add('C1-1', 'T1', 'P1', 1)
+    occupancy.add('C1-1', 'T1', 'P2', 2)
+    occupancy.add('C7-3', 'T2', 'P3', 1)
+
+    occupied, prefixes = pt.layout_map_state(occupancy.snapshot())
+
+    assert set(occupied) == {'C1-1', 'C7-3'}
+    assert occupied['C1-1'] == "Ubicación: C1-1\nSlot 1: Pallet P1 (Camión T1)\nSlot 2: Pallet P2 (Camión T1)"
+    assert prefixes == ['C1', 'C7']